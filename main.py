@@ -8,10 +8,13 @@ OpenAI Realtime API を利用した音声会話を中心に、感情分析・Goo
 
 import asyncio
 import os
+import re
 import signal
 import sys
 import time
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from modules.config import Config
@@ -24,6 +27,23 @@ from modules.email_notifier import EmailNotifier
 
 logger = get_logger(__name__)
 
+# 感情スコア用の語（1回の走査で肯定・否定の出現回数を数える）
+POSITIVE_WORDS = ["元気", "良い", "楽しい", "嬉しい", "安心", "ありがとう"]
+NEGATIVE_WORDS = ["痛い", "悪い", "しんどい", "疲れた", "心配", "不安"]
+_EMOTION_WORD_POLARITY = {
+    **{word: "positive" for word in POSITIVE_WORDS},
+    **{word: "negative" for word in NEGATIVE_WORDS},
+}
+# 先読みで位置ごとに照合し、「不安心」の「不安」と「安心」のような重なりも数える
+_EMOTION_WORDS_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_EMOTION_WORD_POLARITY, key=len, reverse=True))) + "))"
+)
+# 位置ごとに最長の1語しか返らないため、同じ位置から始まる短い語（接頭辞）を補う
+_EMOTION_WORD_PREFIXES = {
+    word: [prefix for prefix in _EMOTION_WORD_POLARITY if word.startswith(prefix)]
+    for word in _EMOTION_WORD_POLARITY
+}
+
 
 class RealtimeCareApp:
     """リアルタイム会話を統括する小さめのアプリケーション層"""
@@ -69,10 +89,18 @@ class RealtimeCareApp:
 
         self.user_name = os.getenv("CARE_USER_NAME", "利用者")
         self.running = False
-        self.handler = RealtimeAudioHandler()
-        self.emotion_manager = EmotionRecordManager()
-        self.google_sheets = GoogleSheetsManager()
-        self.email_notifier = EmailNotifier()
+
+        # DB初期化・Google Sheets・Gmailの準備は互いに独立しているため、
+        # 音声ハンドラーの初期化と並行して別スレッドで行う
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            emotion_future = executor.submit(EmotionRecordManager)
+            sheets_future = executor.submit(GoogleSheetsManager)
+            email_future = executor.submit(EmailNotifier)
+
+            self.handler = RealtimeAudioHandler()
+            self.emotion_manager = emotion_future.result()
+            self.google_sheets = sheets_future.result()
+            self.email_notifier = email_future.result()
 
         self.user_messages: List[str] = []
         self.ai_messages: List[str] = []
@@ -196,10 +224,14 @@ class RealtimeCareApp:
     def _record_to_google_sheets(self, result: ConversationResult) -> None:
         try:
             if self.google_sheets.is_available():
+                # 書き込みはバックグラウンドで行われるため、ここでは受付の成否のみ分かる
                 if self.google_sheets.record_conversation(result, self.user_name):
-                    print("📊 Googleシートに記録を保存しました")
+                    print("📊 Googleシートへの記録を書き込み待ちに追加しました")
                 else:
-                    print("⚠️ Googleシートへの保存に失敗しました")
+                    print("⚠️ Googleシートへの記録を受け付けられませんでした")
+
+                if self.google_sheets.failed_records:
+                    print(f"⚠️ Googleシートに書き込めなかった記録: {self.google_sheets.failed_records}件")
         except Exception as exc:  # noqa: BLE001
             logger.error(f"Googleシート記録エラー: {exc}")
             print(f"⚠️ Googleシート記録でエラーが発生しました: {exc}")
@@ -227,8 +259,8 @@ class RealtimeCareApp:
         return ConversationResult(
             timestamp=datetime.now().isoformat(),
             duration=duration,
-            user_responses=self.user_messages.copy(),
-            ai_responses=self.ai_messages.copy(),
+            user_responses=tuple(self.user_messages),
+            ai_responses=tuple(self.ai_messages),
             safety_status=safety_status,
             emotion_score=emotion_score,
             keywords=keywords,
@@ -254,13 +286,16 @@ class RealtimeCareApp:
         if not self.user_messages:
             return 0.0
 
-        positives = ["元気", "良い", "楽しい", "嬉しい", "安心", "ありがとう"]
-        negatives = ["痛い", "悪い", "しんどい", "疲れた", "心配", "不安"]
         text = " ".join(self.user_messages)
-        positive_score = sum(text.count(word) for word in positives)
-        negative_score = sum(text.count(word) for word in negatives)
-        total_words = max(len(text.split()), 1)
-        score = (positive_score - negative_score) / max(total_words * 0.1, 1)
+        counts = Counter(
+            _EMOTION_WORD_POLARITY[word]
+            for hit in _EMOTION_WORDS_RE.findall(text)
+            for word in _EMOTION_WORD_PREFIXES[hit]
+        )
+        positive_score = counts["positive"]
+        negative_score = counts["negative"]
+        total_chars = len(text)
+        score = (positive_score - negative_score) / max(total_chars * 0.01, 1.0)
         return max(-1.0, min(1.0, score))
 
     def _extract_keywords(self) -> List[str]:
@@ -28,6 +28,11 @@ class Config:
         "DATABASE_PATH", str(PROJECT_ROOT / "data" / "conversations.db")
     )
 
+    # 応答キャッシュ設定（.json と .npy の2ファイルを保存）
+    RESPONSE_CACHE_PATH: str = os.getenv(
+        "RESPONSE_CACHE_PATH", str(PROJECT_ROOT / "data" / "response_cache")
+    )
+
     # ログ設定
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", str(PROJECT_ROOT / "logs" / "app.log"))
@@ -5,18 +5,83 @@
 
 import sqlite3
 import json
+import re
+import sys
+import threading
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .config import Config
 from .logger import get_logger
 from .safety_checker import ConversationResult, SafetyStatus
 
 logger = get_logger(__name__)
 
+# SQL文はモジュール定数にまとめ、sqlite3 のステートメントキャッシュに乗せる
+_CACHED_STATEMENTS = 256
+
+_SQL_INSERT_CONVERSATION = """
+    INSERT INTO conversations (
+        timestamp, duration, safety_status, emotion_score,
+        emotion_category, user_responses, ai_responses,
+        summary, needs_followup
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_EMOTION_ANALYSIS = """
+    INSERT INTO emotion_analysis (
+        conversation_id, timestamp, overall_score, category,
+        confidence, payload
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_SELECT_RECENT_CONVERSATIONS = """
+    SELECT * FROM conversations
+    WHERE timestamp >= ?
+    ORDER BY timestamp DESC
+"""
+
+# 日付×カテゴリで1回だけ集計し、日別推移とカテゴリ別件数をPython側で組み立てる
+_SQL_SELECT_EMOTION_TRENDS = """
+    SELECT DATE(timestamp) as date, emotion_category,
+           COUNT(*) as count, SUM(emotion_score) as total_score
+    FROM conversations
+    WHERE timestamp >= ?
+    GROUP BY DATE(timestamp), emotion_category
+    ORDER BY date
+"""
+
+# payload(JSON)内のキーワード配列を json_each で展開し、SQL側だけで集計する
+_SQL_SELECT_KEYWORD_FREQUENCIES = """
+    SELECT keyword.value as keyword, COUNT(DISTINCT emotion_analysis.id) as count
+    FROM emotion_analysis, json_each(emotion_analysis.payload, '$.detected_keywords') as keyword
+    WHERE emotion_analysis.timestamp >= ?
+    GROUP BY keyword.value
+    ORDER BY count DESC
+"""
+
+_SQL_MARK_FOLLOWUP_COMPLETED = """
+    UPDATE conversations
+    SET follow_up_completed = TRUE
+    WHERE id = ?
+"""
+
+
+def _dumps(obj) -> str:
+    """JSON文字列へ変換（orjsonがあれば高速経路を使う）"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
 class EmotionCategory(Enum):
     """感情カテゴリ"""
     POSITIVE = "positive"      # ポジティブ
@@ -90,6 +155,35 @@ class EmotionAnalyzer:
             "medication": ["薬", "服薬", "飲み忘れ", "薬を飲んだ"]
         }
 
+        # キーワード→カテゴリの逆引き（「元気」のように複数カテゴリに属する語もある）
+        self._kw_to_cat: Dict[str, List[EmotionCategory]] = {}
+        for category, keywords in self.emotion_keywords.items():
+            for keyword in keywords:
+                self._kw_to_cat.setdefault(keyword, []).append(category)
+
+        # 各キーワードについて、同じ位置から始まる短いキーワード（接頭辞）を含めた一覧
+        # 正規表現は位置ごとに最長の1語しか返さないため、「心配性」から「心配」を補う
+        self._kw_prefixes: Dict[str, List[str]] = {
+            keyword: [prefix for prefix in self._kw_to_cat if keyword.startswith(prefix)]
+            for keyword in self._kw_to_cat
+        }
+
+        # 全キーワードを1本の正規表現にまとめ、1回の走査で検出する
+        # 先読みで位置ごとに照合するため「調子良い」と「良い」のような重なりも拾える
+        self._emotion_re = re.compile(
+            "(?=(" + "|".join(
+                re.escape(k) for k in sorted(self._kw_to_cat, key=len, reverse=True)
+            ) + "))"
+        )
+
+        # 健康指標も指標名を名前付きグループにした1本の正規表現で判定する
+        self._health_re = re.compile(
+            "(?=" + "|".join(
+                f"(?P<{indicator}>" + "|".join(re.escape(k) for k in keywords) + ")"
+                for indicator, keywords in self.health_keywords.items()
+            ) + ")"
+        )
+
     def analyze_emotion(self, user_responses: List[str]) -> EmotionAnalysis:
         """感情分析を実行"""
         if not user_responses:
@@ -97,19 +191,26 @@ class EmotionAnalyzer:
 
         all_text = " ".join(user_responses)
 
-        # 各カテゴリのスコア計算
-        category_scores = {}
+        # 各カテゴリのスコア計算（キーワードごとに出現有無で1点）
+        raw_scores = {category: 0 for category in self.emotion_keywords}
         detected_keywords = []
 
+        present = {
+            keyword
+            for hit in self._emotion_re.findall(all_text)
+            for keyword in self._kw_prefixes[hit]
+        }
+
         for category, keywords in self.emotion_keywords.items():
-            score = 0
             for keyword in keywords:
-                if keyword in all_text:
-                    score += 1
+                if keyword in present:
+                    raw_scores[category] += 1
                     detected_keywords.append(keyword)
 
-            # 正規化（全体の単語数に対する割合）
-            total_words = len(all_text.split())
+        # 正規化（全体の単語数に対する割合）
+        total_words = len(all_text.split())
+        category_scores = {}
+        for category, score in raw_scores.items():
             normalized_score = score / max(total_words * 0.1, 1)
             category_scores[category.value] = normalized_score
 
@@ -175,10 +276,10 @@ class EmotionAnalyzer:
 
     def _analyze_health_indicators(self, text: str) -> Dict[str, bool]:
         """健康指標を分析"""
-        indicators = {}
+        indicators = {indicator: False for indicator in self.health_keywords}
 
-        for indicator, keywords in self.health_keywords.items():
-            indicators[indicator] = any(keyword in text for keyword in keywords)
+        for match in self._health_re.finditer(text):
+            indicators[match.lastgroup] = True
 
         return indicators
 
@@ -201,9 +302,27 @@ class ConversationDatabase:
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or Config.DATABASE_PATH
         self._initialized = False
+        # スレッドごとに接続を1本だけ保持して使い回す（sqlite3の接続はスレッド間で共有できない）
+        self._local = threading.local()
         # 遅延初期化: 実際にデータベースにアクセスする時まで初期化を遅らせる
         # self._initialize_database()
 
+    def _conn(self) -> sqlite3.Connection:
+        """現在のスレッド用の接続を取得（初回のみ作成）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=_CACHED_STATEMENTS)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """現在のスレッドの接続を閉じる"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
     def _initialize_database(self):
         """データベースの初期化"""
         if self._initialized:
@@ -213,7 +332,7 @@ class ConversationDatabase:
             # データベースディレクトリの作成
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 # 既存テーブルを一度削除して新スキーマを適用
                 conn.execute("DROP TABLE IF EXISTS emotion_analysis")
                 conn.execute("DROP TABLE IF EXISTS conversations")
@@ -243,9 +362,7 @@ class ConversationDatabase:
                         overall_score REAL NOT NULL,
                         category TEXT NOT NULL,
                         confidence REAL NOT NULL,
-                        detected_keywords TEXT NOT NULL,
-                        sentiment_details TEXT NOT NULL,
-                        health_indicators TEXT NOT NULL,
+                        payload JSON NOT NULL,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         FOREIGN KEY (conversation_id) REFERENCES conversations (id)
                     )
@@ -263,22 +380,16 @@ class ConversationDatabase:
         """会話記録を保存"""
         self._initialize_database()  # 初回アクセス時に初期化
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 # 会話記録の保存
-                cursor = conn.execute("""
-                    INSERT INTO conversations (
-                        timestamp, duration, safety_status, emotion_score,
-                        emotion_category, user_responses, ai_responses,
-                        summary, needs_followup
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                cursor = conn.execute(_SQL_INSERT_CONVERSATION, (
                     result.timestamp,
                     result.duration,
                     result.safety_status.value,
                     result.emotion_score,
                     emotion_analysis.category.value,
-                    json.dumps(result.user_responses, ensure_ascii=False),
-                    json.dumps(result.ai_responses, ensure_ascii=False),
+                    _dumps(result.user_responses),
+                    _dumps(result.ai_responses),
                     result.summary,
                     int(result.needs_followup)
                 ))
@@ -286,20 +397,17 @@ class ConversationDatabase:
                 conversation_id = cursor.lastrowid
 
                 # 感情分析の保存
-                conn.execute("""
-                    INSERT INTO emotion_analysis (
-                        conversation_id, timestamp, overall_score, category,
-                        confidence, detected_keywords, sentiment_details, health_indicators
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                conn.execute(_SQL_INSERT_EMOTION_ANALYSIS, (
                     conversation_id,
                     emotion_analysis.timestamp,
                     emotion_analysis.overall_score,
                     emotion_analysis.category.value,
                     emotion_analysis.confidence,
-                    json.dumps(emotion_analysis.detected_keywords, ensure_ascii=False),
-                    json.dumps(emotion_analysis.sentiment_details, ensure_ascii=False),
-                    json.dumps(emotion_analysis.health_indicators, ensure_ascii=False)
+                    _dumps({
+                        "detected_keywords": emotion_analysis.detected_keywords,
+                        "sentiment_details": emotion_analysis.sentiment_details,
+                        "health_indicators": emotion_analysis.health_indicators
+                    })
                 ))
 
                 conn.commit()
@@ -314,16 +422,10 @@ class ConversationDatabase:
         """最近の会話記録を取得"""
         self._initialize_database()  # 初回アクセス時に初期化
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-
+            with self._conn() as conn:
                 since_date = datetime.now() - timedelta(days=days)
 
-                cursor = conn.execute("""
-                    SELECT * FROM conversations
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp DESC
-                """, (since_date.isoformat(),))
+                cursor = conn.execute(_SQL_SELECT_RECENT_CONVERSATIONS, (since_date.isoformat(),))
 
                 records = []
                 for row in cursor:
@@ -332,7 +434,7 @@ class ConversationDatabase:
                             id=row['id'],
                             timestamp=row['timestamp'],
                             duration=row['duration'],
-                            safety_status=row['safety_status'],
+                            safety_status=sys.intern(row['safety_status']),
                             emotion_score=row['emotion_score'],
                             emotion_category=row['emotion_category'],
                             user_responses=row['user_responses'],
@@ -353,29 +455,24 @@ class ConversationDatabase:
         """感情の傾向を分析"""
         self._initialize_database()  # 初回アクセス時に初期化
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn() as conn:
                 since_date = datetime.now() - timedelta(days=days)
 
+                cursor = conn.execute(_SQL_SELECT_EMOTION_TRENDS, (since_date.isoformat(),))
+
+                daily_totals: Dict[str, List[float]] = {}
+                category_counts: Dict[str, int] = {}
+                for date, category, count, total_score in cursor:
+                    totals = daily_totals.setdefault(date, [0.0, 0])
+                    totals[0] += total_score
+                    totals[1] += count
+                    category_counts[category] = category_counts.get(category, 0) + count
+
                 # 感情スコアの推移
-                cursor = conn.execute("""
-                    SELECT DATE(timestamp) as date, AVG(emotion_score) as avg_score
-                    FROM conversations
-                    WHERE timestamp >= ?
-                    GROUP BY DATE(timestamp)
-                    ORDER BY date
-                """, (since_date.isoformat(),))
-
-                emotion_trends = [{"date": row[0], "score": row[1]} for row in cursor]
-
-                # カテゴリ別集計
-                cursor = conn.execute("""
-                    SELECT emotion_category, COUNT(*) as count
-                    FROM conversations
-                    WHERE timestamp >= ?
-                    GROUP BY emotion_category
-                """, (since_date.isoformat(),))
-
-                category_counts = {row[0]: row[1] for row in cursor}
+                emotion_trends = [
+                    {"date": date, "score": total / count}
+                    for date, (total, count) in daily_totals.items()
+                ]
 
                 return {
                     "emotion_trends": emotion_trends,
@@ -387,16 +484,27 @@ class ConversationDatabase:
             logger.error(f"感情傾向分析エラー: {e}")
             return {}
 
+    def get_keyword_frequencies(self, days: int = 7) -> Dict[str, int]:
+        """検出キーワードの出現頻度（会話単位）を集計"""
+        self._initialize_database()  # 初回アクセス時に初期化
+        try:
+            with self._conn() as conn:
+                since_date = datetime.now() - timedelta(days=days)
+
+                cursor = conn.execute(_SQL_SELECT_KEYWORD_FREQUENCIES, (since_date.isoformat(),))
+
+                return {row[0]: row[1] for row in cursor}
+
+        except Exception as e:
+            logger.error(f"キーワード頻度集計エラー: {e}")
+            return {}
+
     def mark_followup_completed(self, conversation_id: int):
         """フォローアップ完了をマーク"""
         self._initialize_database()  # 初回アクセス時に初期化
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    UPDATE conversations
-                    SET follow_up_completed = TRUE
-                    WHERE id = ?
-                """, (conversation_id,))
+            with self._conn() as conn:
+                conn.execute(_SQL_MARK_FOLLOWUP_COMPLETED, (conversation_id,))
                 conn.commit()
 
                 logger.info(f"フォローアップ完了マーク: ID={conversation_id}")
@@ -434,9 +542,7 @@ class EmotionRecordManager:
         total_conversations = len(conversations)
 
         if total_conversations > 0:
-            for conv in conversations:
-                status = conv.safety_status
-                safety_stats[status] = safety_stats.get(status, 0) + 1
+            safety_stats = Counter(conv.safety_status for conv in conversations)
 
             # パーセンテージに変換
             safety_stats = {k: (v / total_conversations) * 100 for k, v in safety_stats.items()}
@@ -461,8 +567,8 @@ def example_emotion_analysis():
     test_result = ConversationResult(
         timestamp=datetime.now().isoformat(),
         duration=120.5,
-        user_responses=["元気です", "薬は飲んでいます", "少し疲れました"],
-        ai_responses=["こんにちは", "お薬について", "お疲れ様です"],
+        user_responses=("元気です", "薬は飲んでいます", "少し疲れました"),
+        ai_responses=("こんにちは", "お薬について", "お疲れ様です"),
         safety_status=SafetyStatus.SAFE,
         emotion_score=0.3,
         keywords=["元気", "薬", "疲れ"],
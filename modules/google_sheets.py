@@ -3,11 +3,16 @@ Googleシート連携モジュール
 会話記録を家族と共有するためのGoogleシート操作
 """
 
+import atexit
 import json
 import os
+import queue
 import sys
-from datetime import datetime
-from typing import Optional, Dict, List, Any
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import zip_longest
+from typing import Optional, Dict, List, Any, Tuple
 from dataclasses import asdict
 
 try:
@@ -24,6 +29,19 @@ from .safety_checker import ConversationResult, SafetyStatus
 
 logger = get_logger(__name__)
 
+# バックグラウンド書き込みのまとめ単位
+_BATCH_SIZE = 20
+_BATCH_TIMEOUT = 2.0  # 秒
+_MAX_WRITE_ATTEMPTS = 3  # 書き込み失敗時の最大試行回数
+_RETRY_DELAY = 2.0  # 秒
+_STOP = object()
+
+# アクセストークンのキャッシュ（起動ごとのJWT署名とトークン取得を省く）
+_TOKEN_CACHE_PATH = os.getenv(
+    'GOOGLE_SHEETS_TOKEN_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'rzpy', 'gsheets_token.json')
+)
+
 class GoogleSheetsManager:
     """Googleシート管理クラス"""
 
@@ -35,6 +53,14 @@ class GoogleSheetsManager:
         self.spreadsheet_id = os.getenv('GOOGLE_SPREADSHEET_ID', '')
         self._initialized = False
 
+        # 書き込みキュー（record_conversation は積むだけで即座に返る）
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+        # 再試行しても書き込めずに破棄した記録の件数（呼び出し側で確認できる）
+        self.failed_records = 0
+
         if not gspread:
             logger.warning("gspread モジュールがインストールされていません。Google Sheets機能を無効化します。")
             return
@@ -65,6 +91,10 @@ class GoogleSheetsManager:
                 scopes=scopes
             )
 
+            # 前回のトークンが有効期限内なら再利用する
+            self._load_cached_token(credentials, scopes)
+            cached_token = credentials.token
+
             # gspreadクライアントの初期化
             self.client = gspread.authorize(credentials)
 
@@ -73,6 +103,10 @@ class GoogleSheetsManager:
             else:
                 logger.warning("GOOGLE_SPREADSHEET_ID が設定されていません")
 
+            # 新しいトークンを取得していれば保存
+            if credentials.token and credentials.token != cached_token:
+                self._save_cached_token(credentials, scopes)
+
             self._initialized = True
 
         except FileNotFoundError:
@@ -82,6 +116,52 @@ class GoogleSheetsManager:
         except Exception as e:
             logger.error(f"Google Sheetsクライアント初期化エラー: {e}")
 
+    def _load_cached_token(self, credentials, scopes: List[str]):
+        """キャッシュ済みのアクセストークンを認証情報に設定"""
+        try:
+            with open(_TOKEN_CACHE_PATH, encoding='utf-8') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"トークンキャッシュ読み込みエラー: {e}")
+            return
+
+        # 別のサービスアカウントやスコープのトークンは使わない
+        if (cached.get('client_email') != credentials.service_account_email
+                or cached.get('scopes') != scopes):
+            return
+
+        try:
+            credentials.token = cached['token']
+            credentials.expiry = datetime.fromisoformat(cached['expiry'])
+        except (KeyError, TypeError, ValueError):
+            credentials.token = None
+            credentials.expiry = None
+            return
+
+        if credentials.expired:
+            credentials.token = None
+            credentials.expiry = None
+
+    def _save_cached_token(self, credentials, scopes: List[str]):
+        """アクセストークンを有効期限とともに保存（所有者のみ読み書き可）"""
+        if credentials.expiry is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(_TOKEN_CACHE_PATH), exist_ok=True)
+            fd = os.open(_TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'client_email': credentials.service_account_email,
+                    'scopes': scopes,
+                    'token': credentials.token,
+                    'expiry': credentials.expiry.isoformat()
+                }, f)
+        except Exception as e:
+            logger.warning(f"トークンキャッシュ保存エラー: {e}")
+
     def _initialize_spreadsheet(self):
         """スプレッドシートとワークシートの初期化"""
         try:
@@ -142,79 +222,184 @@ class GoogleSheetsManager:
                 self.worksheet is not None)
 
     def record_conversation(self, result: ConversationResult, user_name: str = "利用者") -> bool:
-        """会話記録をGoogle Sheetsに保存"""
+        """会話記録をGoogle Sheetsへの書き込みキューに積む（書き込みはバックグラウンドで実行）"""
         if not self.is_available():
             logger.warning("Google Sheets機能が利用できません")
             return False
 
         try:
-            # 日時の変換
+            row_data = self._build_row(result, user_name)
+        except Exception as e:
+            logger.error(f"Google Sheets記録エラー: {e}")
+            return False
+
+        self._ensure_worker()
+        self._queue.put((row_data, result.safety_status, 0))
+        return True
+
+    def flush(self):
+        """キューに積まれた記録の書き込み完了を待つ"""
+        if self._worker is None:
+            return
+
+        self._queue.join()
+
+    def _build_row(self, result: ConversationResult, user_name: str) -> List[Any]:
+        """会話記録を1行分のセル値に変換"""
+        # 日時の変換（datetime.now().isoformat() 形式なら文字列操作のみで済ませる）
+        if 'Z' in result.timestamp or '+' in result.timestamp:
             timestamp = datetime.fromisoformat(result.timestamp.replace('Z', '+00:00'))
             date_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            date_str = result.timestamp[:19].replace('T', ' ')
+
+        # 会話時間（分）
+        duration_min = round(result.duration / 60, 1)
+
+        # キーワードの結合
+        keywords_str = ', '.join(result.keywords) if result.keywords else ''
+
+        # ユーザー発言の結合（最大500文字）
+        user_text = ' | '.join(result.user_responses)
+        if len(user_text) > 500:
+            user_text = user_text[:497] + '...'
+
+        # AI応答の結合（最大500文字）
+        ai_text = ' | '.join(result.ai_responses)
+        if len(ai_text) > 500:
+            ai_text = ai_text[:497] + '...'
+
+        return [
+            date_str,
+            user_name,
+            duration_min,
+            result.safety_status.value,
+            round(result.emotion_score, 2),
+            keywords_str,
+            result.summary,
+            'はい' if result.needs_followup else 'いいえ',
+            user_text,
+            ai_text
+        ]
 
-            # 会話時間（分）
-            duration_min = round(result.duration / 60, 1)
-
-            # キーワードの結合
-            keywords_str = ', '.join(result.keywords) if result.keywords else ''
-
-            # ユーザー発言の結合（最大500文字）
-            user_text = ' | '.join(result.user_responses)
-            if len(user_text) > 500:
-                user_text = user_text[:497] + '...'
-
-            # AI応答の結合（最大500文字）
-            ai_text = ' | '.join(result.ai_responses)
-            if len(ai_text) > 500:
-                ai_text = ai_text[:497] + '...'
-
-            # 行データの準備
-            row_data = [
-                date_str,
-                user_name,
-                duration_min,
-                result.safety_status.value,
-                round(result.emotion_score, 2),
-                keywords_str,
-                result.summary,
-                'はい' if result.needs_followup else 'いいえ',
-                user_text,
-                ai_text
-            ]
+    def _ensure_worker(self):
+        """書き込み用のバックグラウンドスレッドを起動（初回のみ）"""
+        with self._worker_lock:
+            if self._worker is not None:
+                return
+
+            self._worker = threading.Thread(target=self._drain, name="google-sheets-writer", daemon=True)
+            self._worker.start()
+            atexit.register(self._flush_and_join)
 
+    def _drain(self):
+        """キューの記録をまとめてGoogle Sheetsに書き込む"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            # 最大20件、または2秒待って届いた分までをまとめる
+            batch = [item]
+            stop_requested = False
+            deadline = time.monotonic() + _BATCH_TIMEOUT
+            while len(batch) < _BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop_requested = True
+                    break
+                batch.append(item)
+
+            try:
+                if not self._write_rows(batch) and self._requeue_failed(batch) and stop_requested:
+                    # 再試行分を書き終えてから停止する
+                    self._queue.put(_STOP)
+                    stop_requested = False
+            finally:
+                for _ in range(len(batch) + stop_requested):
+                    self._queue.task_done()
+
+            if stop_requested:
+                return
+
+    def _requeue_failed(self, batch: List[Tuple[List[Any], SafetyStatus, int]]) -> bool:
+        """書き込みに失敗した記録をキューへ戻す（上限回数に達した分は破棄、戻した分があれば True）"""
+        retry = [
+            (row, status, attempts + 1)
+            for row, status, attempts in batch
+            if attempts + 1 < _MAX_WRITE_ATTEMPTS
+        ]
+
+        dropped = len(batch) - len(retry)
+        if dropped:
+            self.failed_records += dropped
+            logger.error(f"Google Sheetsへの記録を{dropped}件破棄しました（{_MAX_WRITE_ATTEMPTS}回失敗）")
+
+        if not retry:
+            return False
+
+        time.sleep(_RETRY_DELAY)
+        for item in retry:
+            self._queue.put(item)
+        return True
+
+    def _write_rows(self, batch: List[Tuple[List[Any], SafetyStatus, int]]) -> bool:
+        """複数行の値と書式をそれぞれ1回のAPI呼び出しで書き込む"""
+        try:
             # 次の空行を見つけて追加
-            next_row = len(self.worksheet.get_all_values()) + 1
-            self.worksheet.update(f'A{next_row}:J{next_row}', [row_data])
+            first_row = len(self.worksheet.col_values(1)) + 1
+            last_row = first_row + len(batch) - 1
+            self.worksheet.update(f'A{first_row}:J{last_row}', [row for row, _, _ in batch])
 
             # ステータスに応じたセルの色付け
-            self._apply_status_formatting(next_row, result.safety_status)
+            self._apply_status_formatting(first_row, [status for _, status, _ in batch])
 
-            logger.info(f"Google Sheetsに会話記録を保存しました (行: {next_row})")
+            logger.info(f"Google Sheetsに会話記録を保存しました (行: {first_row}-{last_row})")
             return True
 
         except Exception as e:
             logger.error(f"Google Sheets記録エラー: {e}")
             return False
 
-    def _apply_status_formatting(self, row: int, status: SafetyStatus):
+    def _flush_and_join(self):
+        """終了時に未書き込みの記録を書き出してスレッドを停止"""
+        if self._worker is None or not self._worker.is_alive():
+            return
+
+        self._queue.put(_STOP)
+        self._worker.join(timeout=10)
+
+    def _apply_status_formatting(self, first_row: int, statuses: List[SafetyStatus]):
         """ステータスに応じたセルの色付け"""
         try:
-            if status == SafetyStatus.EMERGENCY:
-                # 緊急時は赤色
-                color = {'red': 1.0, 'green': 0.8, 'blue': 0.8}
-            elif status == SafetyStatus.NEEDS_ATTENTION:
-                # 要注意は黄色
-                color = {'red': 1.0, 'green': 1.0, 'blue': 0.8}
-            elif status == SafetyStatus.SAFE:
-                # 安全は薄緑
-                color = {'red': 0.8, 'green': 1.0, 'blue': 0.8}
-            else:
-                # 不明は薄グレー
-                color = {'red': 0.9, 'green': 0.9, 'blue': 0.9}
-
-            self.worksheet.format(f'A{row}:J{row}', {
-                'backgroundColor': color
-            })
+            formats = []
+            for row, status in enumerate(statuses, start=first_row):
+                if status == SafetyStatus.EMERGENCY:
+                    # 緊急時は赤色
+                    color = {'red': 1.0, 'green': 0.8, 'blue': 0.8}
+                elif status == SafetyStatus.NEEDS_ATTENTION:
+                    # 要注意は黄色
+                    color = {'red': 1.0, 'green': 1.0, 'blue': 0.8}
+                elif status == SafetyStatus.SAFE:
+                    # 安全は薄緑
+                    color = {'red': 0.8, 'green': 1.0, 'blue': 0.8}
+                else:
+                    # 不明は薄グレー
+                    color = {'red': 0.9, 'green': 0.9, 'blue': 0.9}
+
+                formats.append({
+                    'range': f'A{row}:J{row}',
+                    'format': {'backgroundColor': color}
+                })
+
+            self.worksheet.batch_format(formats)
 
         except Exception as e:
             logger.warning(f"セル色付けエラー: {e}")
@@ -251,25 +436,55 @@ class GoogleSheetsManager:
             logger.error(f"記録取得エラー: {e}")
             return []
 
+    def get_status_and_scores(self, days: int = 7) -> List[Tuple[str, Any]]:
+        """最近の記録の安否ステータスと感情スコアのみを取得"""
+        if not self.is_available():
+            return []
+
+        try:
+            # 集計に必要な列（日時・安否ステータス・感情スコア）だけを取得
+            dates, statuses, scores = self.worksheet.batch_get(['A2:A', 'D2:D', 'E2:E'])
+
+            cutoff_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            cutoff_date -= timedelta(days=days)
+
+            recent = []
+            for date_cell, status_cell, score_cell in zip_longest(dates, statuses, scores, fillvalue=[]):
+                try:
+                    record_date = datetime.strptime(date_cell[0], '%Y-%m-%d %H:%M:%S')
+                except (ValueError, IndexError):
+                    continue
+
+                if record_date >= cutoff_date:
+                    status = status_cell[0] if status_cell else ''
+                    score = score_cell[0] if score_cell else 0
+                    recent.append((status, score))
+
+            logger.info(f"過去{days}日間の集計用データを{len(recent)}件取得しました")
+            return recent
+
+        except Exception as e:
+            logger.error(f"集計用データ取得エラー: {e}")
+            return []
+
     def generate_summary_report(self, days: int = 7) -> Optional[str]:
         """サマリーレポートを生成"""
-        records = self.get_recent_records(days)
+        records = self.get_status_and_scores(days)
 
         if not records:
             return f"過去{days}日間の記録がありません。"
 
         # 統計情報の計算
         total_conversations = len(records)
-        safe_count = sum(1 for r in records if r.get('安否ステータス') == 'safe')
-        attention_count = sum(1 for r in records if r.get('安否ステータス') == 'attention')
-        emergency_count = sum(1 for r in records if r.get('安否ステータス') == 'emergency')
+        safe_count = sum(1 for status, _ in records if status == 'safe')
+        attention_count = sum(1 for status, _ in records if status == 'attention')
+        emergency_count = sum(1 for status, _ in records if status == 'emergency')
 
         # 平均感情スコア
         emotion_scores = []
-        for r in records:
+        for _, score in records:
             try:
-                score = float(r.get('感情スコア', 0))
-                emotion_scores.append(score)
+                emotion_scores.append(float(score))
             except (ValueError, TypeError):
                 continue
 
@@ -315,8 +530,8 @@ def test_google_sheets_connection():
         test_result = ConversationResult(
             timestamp=datetime.now().isoformat(),
             duration=120.5,
-            user_responses=["元気です", "はい、薬も飲んでいます"],
-            ai_responses=["それは良かったです", "お薬忘れずに飲んでいて偉いですね"],
+            user_responses=("元気です", "はい、薬も飲んでいます"),
+            ai_responses=("それは良かったです", "お薬忘れずに飲んでいて偉いですね"),
             safety_status=SafetyStatus.SAFE,
             emotion_score=0.8,
             keywords=["元気", "薬"],
@@ -325,7 +540,11 @@ def test_google_sheets_connection():
         )
 
         # テスト記録の追加
-        if manager.record_conversation(test_result, "テストユーザー"):
+        recorded = manager.record_conversation(test_result, "テストユーザー")
+        if recorded:
+            manager.flush()
+
+        if recorded and manager.failed_records == 0:
             print("✅ テスト記録の追加に成功しました")
         else:
             print("❌ テスト記録の追加に失敗しました")
@@ -3,8 +3,11 @@
 アプリケーション全体のログを統一管理
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
@@ -14,34 +17,87 @@ from .config import Config
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# 既定のログレベルは読み込み時に一度だけ解決する
+_DEFAULT_LEVEL = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
 
-def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
-    """ロガーのセットアップ"""
-    logger = logging.getLogger(name)
+# ログ出力先ディレクトリも読み込み時に一度だけ作成する
+_log_dir_error: Optional[Exception] = None
+try:
+    Path(Config.LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+except Exception as exc:  # noqa: BLE001
+    _log_dir_error = exc
 
-    if logger.handlers:
-        return logger
+# 各ロガーはキューに積むだけにし、実際の出力はバックグラウンドのリスナーが行う
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+# 全ロガーで同じQueueHandlerを共有する（出力先はリスナー側の1組のみ）
+_queue_handler = QueueHandler(_log_queue)
+_listener: Optional[QueueListener] = None
+# ファイル出力はメモリ上にためてまとめて書き込む（緊急検知などのWARNING以上は即時書き込み）
+_file_buffer: Optional[MemoryHandler] = None
+FILE_BUFFER_CAPACITY = 1024
+
+
+def _start_listener() -> None:
+    """コンソール・ファイル出力を担うQueueListenerを起動（初回のみ）"""
+    global _listener, _file_buffer
 
-    log_level = level or Config.LOG_LEVEL
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    if _listener is not None:
+        return
 
     formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    handlers = []
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
+
+    file_error: Optional[Exception] = _log_dir_error
+    if file_error is None:
+        try:
+            file_handler = logging.FileHandler(Config.LOG_FILE, encoding="utf-8")
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+
+            _file_buffer = MemoryHandler(
+                capacity=FILE_BUFFER_CAPACITY,
+                flushLevel=logging.WARNING,
+                target=file_handler,
+            )
+            _file_buffer.setLevel(logging.DEBUG)
+            handlers.append(_file_buffer)
+            atexit.register(_file_buffer.flush)
+        except Exception as exc:  # noqa: BLE001
+            file_error = exc
+
+    _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    if file_error is not None:
+        setup_logger(__name__).warning("ログファイルの設定に失敗しました: %s", file_error)
+
+
+def flush_logs() -> None:
+    """バッファ中のファイルログを書き出す"""
+    if _file_buffer is not None:
+        _file_buffer.flush()
 
-    try:
-        log_file_path = Path(Config.LOG_FILE)
-        log_file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_handler = logging.FileHandler(Config.LOG_FILE, encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    except Exception as exc:  # noqa: BLE001
-        logger.warning(f"ログファイルの設定に失敗しました: {exc}")
+def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
+    """ロガーのセットアップ"""
+    logger = logging.getLogger(name)
+
+    if logger.handlers:
+        return logger
+
+    if level:
+        logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+    else:
+        logger.setLevel(_DEFAULT_LEVEL)
+
+    _start_listener()
+    logger.addHandler(_queue_handler)
 
     logger.propagate = False
     return logger
@@ -58,22 +114,25 @@ class AudioLogger:
         self.logger = get_logger(name)
 
     def debug_audio(self, message: str, audio_data: Optional[bytes] = None):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+
         if audio_data:
-            self.logger.debug(f"{message} (サイズ: {len(audio_data)} bytes)")
+            self.logger.debug("%s (サイズ: %d bytes)", message, len(audio_data))
         else:
             self.logger.debug(message)
 
     def info_session(self, message: str):
-        self.logger.info(f"[SESSION] {message}")
+        self.logger.info("[SESSION] %s", message)
 
     def warning_connection(self, message: str):
-        self.logger.warning(f"[CONNECTION] {message}")
+        self.logger.warning("[CONNECTION] %s", message)
 
     def error_api(self, message: str, error: Optional[Exception] = None):
         if error:
-            self.logger.error(f"[API ERROR] {message}: {error}")
+            self.logger.error("[API ERROR] %s: %s", message, error)
         else:
-            self.logger.error(f"[API ERROR] {message}")
+            self.logger.error("[API ERROR] %s", message)
 
 
 class ConversationLogger:
@@ -83,18 +142,28 @@ class ConversationLogger:
         self.logger = get_logger(name)
 
     def log_user_input(self, text: str):
-        self.logger.info(f"[USER] {text}")
+        self.logger.info("[USER] %s", text)
 
     def log_ai_response(self, text: str):
-        self.logger.info(f"[AI] {text}")
+        self.logger.info("[AI] %s", text)
 
     def log_transcription(self, text: str):
-        self.logger.debug(f"[TRANSCRIPTION] {text}")
+        self.logger.debug("[TRANSCRIPTION] %s", text)
 
     def log_conversation_start(self, user_id: Optional[str] = None):
-        user_info = f" (ユーザー: {user_id})" if user_id else ""
-        self.logger.info(f"[CONVERSATION START]{user_info}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        if user_id:
+            self.logger.info("[CONVERSATION START] (ユーザー: %s)", user_id)
+        else:
+            self.logger.info("[CONVERSATION START]")
 
     def log_conversation_end(self, duration: Optional[float] = None):
-        duration_info = f" (時間: {duration:.1f}秒)" if duration else ""
-        self.logger.info(f"[CONVERSATION END]{duration_info}")
\ No newline at end of file
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        if duration:
+            self.logger.info("[CONVERSATION END] (時間: %.1f秒)", duration)
+        else:
+            self.logger.info("[CONVERSATION END]")
@@ -5,10 +5,10 @@
 
 import asyncio
 import json
-import time
+import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Callable, Tuple
+from dataclasses import dataclass, fields
 from enum import Enum
 
 from .audio_handler import RealtimeAudioHandler, AudioConfig
@@ -18,6 +18,71 @@ from .logger import get_logger, ConversationLogger
 logger = get_logger(__name__)
 conv_logger = ConversationLogger()
 
+# 判定用キーワード
+NEGATIVE_WORDS = (
+    "痛い", "痛み", "具合悪い", "調子悪い", "気分悪い",
+    "しんどい", "疲れた", "眠れない", "食欲ない",
+    "心配", "不安", "寂しい", "悲しい"
+)
+
+EMERGENCY_KEYWORDS = (
+    "助けて", "痛い", "苦しい", "息ができない",
+    "倒れ", "転んだ", "動けない", "意識",
+    "救急車", "病院", "緊急"
+)
+
+POSITIVE_SCORE_WORDS = ("元気", "良い", "大丈夫", "楽しい", "嬉しい", "ありがとう")
+NEGATIVE_SCORE_WORDS = ("痛い", "悪い", "しんどい", "疲れた", "心配", "不安")
+
+IMPORTANT_KEYWORDS = (
+    "薬", "病院", "医者", "痛み", "食事", "睡眠",
+    "家族", "友達", "散歩", "買い物", "テレビ",
+    "元気", "疲れた", "楽しい", "心配"
+)
+
+
+def _compile_keywords(keywords) -> "re.Pattern[str]":
+    """キーワード群を1本の正規表現にまとめる"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+_NEGATIVE_RE = _compile_keywords(NEGATIVE_WORDS)
+
+# 時刻(0-23時)→挨拶の対応表
+_HOUR_TO_GREETING = (
+    ["こんばんは"] * 6            # 0-5時
+    + ["おはようございます"] * 6  # 6-11時
+    + ["こんにちは"] * 6          # 12-17時
+    + ["こんばんは"] * 6          # 18-23時
+)
+
+# 会話全体の分析用：全キーワードを1本の正規表現にまとめ、1回の走査で各分類を判定する
+# （同じ語が複数の分類に属するため、語→分類の対応表で振り分ける）
+_KEYWORD_GROUPS = {
+    "negative": NEGATIVE_WORDS,
+    "emergency": EMERGENCY_KEYWORDS,
+    "positive": POSITIVE_SCORE_WORDS,
+    "negative_score": NEGATIVE_SCORE_WORDS,
+    "keyword": IMPORTANT_KEYWORDS,
+}
+
+_KEYWORD_TO_GROUPS: Dict[str, List[str]] = {}
+for _group, _words in _KEYWORD_GROUPS.items():
+    for _word in _words:
+        _KEYWORD_TO_GROUPS.setdefault(_word, []).append(_group)
+
+# 先読みで位置ごとに照合し、「具合悪い」と「悪い」のような重なりも拾う
+_COMBINED_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_KEYWORD_TO_GROUPS, key=len, reverse=True))) + "))"
+)
+
+# 各語について、同じ位置から始まる短い語（接頭辞）を含めた一覧
+# 正規表現は位置ごとに最長の1語しか返さないため、「薬を飲んだ」から「薬」を補う
+_KEYWORD_PREFIXES: Dict[str, List[str]] = {
+    _word: [_prefix for _prefix in _KEYWORD_TO_GROUPS if _word.startswith(_prefix)]
+    for _word in _KEYWORD_TO_GROUPS
+}
+
 class SafetyStatus(Enum):
     """安否確認ステータス"""
     UNKNOWN = "unknown"           # 未確認
@@ -25,19 +90,27 @@ class SafetyStatus(Enum):
     NEEDS_ATTENTION = "attention" # 要注意
     EMERGENCY = "emergency"       # 緊急
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConversationResult:
     """会話結果"""
     timestamp: str
     duration: float
-    user_responses: List[str]
-    ai_responses: List[str]
+    user_responses: Tuple[str, ...]
+    ai_responses: Tuple[str, ...]
     safety_status: SafetyStatus
     emotion_score: float  # -1.0(negative) to 1.0(positive)
     keywords: List[str]
     summary: str
     needs_followup: bool
 
+    def to_json(self) -> str:
+        """JSON文字列に変換（asdict のような深いコピーはせずフィールドを直接参照する）"""
+        data = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            data[field.name] = value.value if isinstance(value, Enum) else value
+        return json.dumps(data, ensure_ascii=False)
+
 class SafetyChecker:
     """安否確認システム"""
 
@@ -46,12 +119,22 @@ class SafetyChecker:
         self.audio_handler = RealtimeAudioHandler()
         self.conversation_active = False
         self.start_time = None
+        self._started_at: Optional[datetime] = None
 
         # 会話データ
         self.user_responses = []
         self.ai_responses = []
         self.current_transcript = ""
 
+        # 分析用に応答を逐次結合した文字列と、ネガティブな応答数を保持する
+        self._joined_responses = ""
+        self._negative_count = 0
+        # 緊急キーワードを含んだ最後の応答の位置（なければ -1）
+        self._last_emergency_index = -1
+
+        # 新しい応答の到着通知（ポーリングせずに待機するため）
+        self._new_response_event = asyncio.Event()
+
         # コールバック設定
         self.on_safety_status_change: Optional[Callable[[SafetyStatus], None]] = None
         self.on_conversation_complete: Optional[Callable[[ConversationResult], None]] = None
@@ -66,8 +149,14 @@ class SafetyChecker:
             """音声認識結果の処理"""
             self.current_transcript = text
             self.user_responses.append(text)
+            self._joined_responses = f"{self._joined_responses} {text}" if self._joined_responses else text
+            matches = self._analyze_once(text)
+            if matches["negative"]:
+                self._negative_count += 1
+            if matches["emergency"]:
+                self._last_emergency_index = len(self.user_responses) - 1
+            self._new_response_event.set()
             conv_logger.log_user_input(text)
-            logger.info(f"ユーザー: {text}")
 
         def on_response_start():
             """AI応答開始"""
@@ -88,15 +177,30 @@ class SafetyChecker:
             on_error=on_error
         )
 
+    def _reset(self):
+        """会話データを初期化（音声ハンドラーやコールバックはそのまま再利用する）"""
+        self.conversation_active = False
+        self.start_time = None
+        self._started_at = None
+        self.user_responses.clear()
+        self.ai_responses.clear()
+        self.current_transcript = ""
+        self._joined_responses = ""
+        self._negative_count = 0
+        self._last_emergency_index = -1
+        self._new_response_event = asyncio.Event()
+
     async def start_safety_check(self) -> ConversationResult:
         """安否確認を開始"""
         logger.info(f"安否確認開始: {self.user_name}")
         conv_logger.log_conversation_start(self.user_name)
 
-        self.start_time = time.time()
+        self._reset()
+
+        # 開始時刻は1度だけ取得し、挨拶の時間帯判定にも使い回す
+        self._started_at = datetime.now()
+        self.start_time = self._started_at.timestamp()
         self.conversation_active = True
-        self.user_responses.clear()
-        self.ai_responses.clear()
 
         try:
             # リアルタイムAPI接続
@@ -163,14 +267,8 @@ class SafetyChecker:
 
     async def _greeting_step(self):
         """挨拶ステップ"""
-        current_hour = datetime.now().hour
-
-        if 6 <= current_hour < 12:
-            greeting = f"おはようございます、{self.user_name}。"
-        elif 12 <= current_hour < 18:
-            greeting = f"こんにちは、{self.user_name}。"
-        else:
-            greeting = f"こんばんは、{self.user_name}。"
+        current_hour = (self._started_at or datetime.now()).hour
+        greeting = f"{_HOUR_TO_GREETING[current_hour]}、{self.user_name}。"
 
         message = f"{greeting}今日の調子はいかがですか？"
         await self._send_message_and_wait(message, expected_response_time=10)
@@ -219,58 +317,52 @@ class SafetyChecker:
 
     async def _wait_for_user_response(self):
         """ユーザーの応答を待機（音声会話は別途実行中）"""
-        initial_response_count = len(self.user_responses)
+        if not self.conversation_active:
+            return
 
-        # 新しい応答があるまで待機
-        while len(self.user_responses) <= initial_response_count:
-            await asyncio.sleep(0.5)
-            if not self.conversation_active:
-                break
+        # 新しい応答があるまで待機（会話終了時も通知される）
+        self._new_response_event.clear()
+        await self._new_response_event.wait()
+        self._new_response_event.clear()
 
     def _contains_negative_words(self, text: str) -> bool:
         """ネガティブな言葉を含むかチェック"""
-        negative_words = [
-            "痛い", "痛み", "具合悪い", "調子悪い", "気分悪い",
-            "しんどい", "疲れた", "眠れない", "食欲ない",
-            "心配", "不安", "寂しい", "悲しい"
-        ]
-        return any(word in text for word in negative_words)
+        return _NEGATIVE_RE.search(text) is not None
 
     def _detect_emergency(self) -> bool:
-        """緊急状況の検知"""
-        emergency_keywords = [
-            "助けて", "痛い", "苦しい", "息ができない",
-            "倒れ", "転んだ", "動けない", "意識",
-            "救急車", "病院", "緊急"
-        ]
-
-        recent_responses = " ".join(self.user_responses[-3:])  # 直近3つの応答
-        return any(keyword in recent_responses for keyword in emergency_keywords)
+        """緊急状況の検知（直近3つの応答のいずれかに緊急キーワードがあるか）"""
+        if self._last_emergency_index < 0:
+            return False
+        return self._last_emergency_index >= len(self.user_responses) - 3
 
     async def _analyze_conversation(self) -> ConversationResult:
         """会話を分析して結果を作成"""
-        duration = time.time() - self.start_time if self.start_time else 0
+        finished_at = datetime.now()
+        duration = finished_at.timestamp() - self.start_time if self.start_time else 0
+
+        # 会話全体のキーワード走査（1回のみ）
+        matches = self._analyze_once(self._joined_responses)
 
         # 安否ステータスの判定
         safety_status = self._determine_safety_status()
 
         # 感情スコアの計算
-        emotion_score = self._calculate_emotion_score()
+        emotion_score = self._calculate_emotion_score(matches)
 
         # キーワード抽出
-        keywords = self._extract_keywords()
+        keywords = self._extract_keywords(matches)
 
         # 要約生成
-        summary = self._generate_summary()
+        summary = self._generate_summary(emotion_score)
 
         # フォローアップの必要性判定
         needs_followup = safety_status in [SafetyStatus.NEEDS_ATTENTION, SafetyStatus.EMERGENCY]
 
         result = ConversationResult(
-            timestamp=datetime.now().isoformat(),
+            timestamp=finished_at.isoformat(),
             duration=duration,
-            user_responses=self.user_responses.copy(),
-            ai_responses=self.ai_responses.copy(),
+            user_responses=tuple(self.user_responses),
+            ai_responses=tuple(self.ai_responses),
             safety_status=safety_status,
             emotion_score=emotion_score,
             keywords=keywords,
@@ -292,15 +384,12 @@ class SafetyChecker:
         if not self.user_responses:
             return SafetyStatus.UNKNOWN
 
-        all_responses = " ".join(self.user_responses)
-
         # 緊急キーワードのチェック
         if self._detect_emergency():
             return SafetyStatus.EMERGENCY
 
         # ネガティブな応答のチェック
-        negative_count = sum(1 for response in self.user_responses
-                           if self._contains_negative_words(response))
+        negative_count = self._negative_count
 
         if negative_count >= 2:
             return SafetyStatus.NEEDS_ATTENTION
@@ -309,48 +398,57 @@ class SafetyChecker:
         else:
             return SafetyStatus.SAFE
 
-    def _calculate_emotion_score(self) -> float:
+    @staticmethod
+    def _analyze_once(text: str) -> Dict[str, List[str]]:
+        """テキストを1回走査し、分類ごとに検出した語（重複なし・キーワード定義順）を返す"""
+        present = {
+            word
+            for hit in _COMBINED_RE.findall(text)
+            for word in _KEYWORD_PREFIXES[hit]
+        }
+
+        return {
+            group: [word for word in words if word in present]
+            for group, words in _KEYWORD_GROUPS.items()
+        }
+
+    def _calculate_emotion_score(self, matches: Optional[Dict[str, List[str]]] = None) -> float:
         """感情スコアを計算（-1.0 to 1.0）"""
         if not self.user_responses:
             return 0.0
 
-        positive_words = ["元気", "良い", "大丈夫", "楽しい", "嬉しい", "ありがとう"]
-        negative_words = ["痛い", "悪い", "しんどい", "疲れた", "心配", "不安"]
-
-        all_text = " ".join(self.user_responses)
+        all_text = self._joined_responses
+        if matches is None:
+            matches = self._analyze_once(all_text)
 
-        positive_score = sum(1 for word in positive_words if word in all_text)
-        negative_score = sum(1 for word in negative_words if word in all_text)
+        # 出現した語の種類数で数える
+        positive_score = len(matches["positive"])
+        negative_score = len(matches["negative_score"])
 
-        total_words = len(all_text.split())
-        if total_words == 0:
+        # 日本語は空白で単語が区切られないため文字数で正規化する
+        total_chars = len(all_text)
+        if total_chars == 0:
             return 0.0
 
         # 正規化されたスコア
-        score = (positive_score - negative_score) / max(total_words * 0.1, 1)
+        score = (positive_score - negative_score) / max(total_chars * 0.01, 1.0)
         return max(-1.0, min(1.0, score))
 
-    def _extract_keywords(self) -> List[str]:
+    def _extract_keywords(self, matches: Optional[Dict[str, List[str]]] = None) -> List[str]:
         """重要なキーワードを抽出"""
-        important_keywords = [
-            "薬", "病院", "医者", "痛み", "食事", "睡眠",
-            "家族", "友達", "散歩", "買い物", "テレビ",
-            "元気", "疲れた", "楽しい", "心配"
-        ]
-
-        all_text = " ".join(self.user_responses)
-        found_keywords = [keyword for keyword in important_keywords if keyword in all_text]
-
-        return found_keywords
+        if matches is None:
+            matches = self._analyze_once(self._joined_responses)
+        return matches["keyword"]
 
-    def _generate_summary(self) -> str:
+    def _generate_summary(self, emotion_score: Optional[float] = None) -> str:
         """会話の要約を生成"""
         if not self.user_responses:
             return "応答なし"
 
         # 簡単な要約ロジック
         response_count = len(self.user_responses)
-        emotion_score = self._calculate_emotion_score()
+        if emotion_score is None:
+            emotion_score = self._calculate_emotion_score()
 
         if emotion_score > 0.3:
             mood = "良好"
@@ -366,8 +464,8 @@ class SafetyChecker:
         return ConversationResult(
             timestamp=datetime.now().isoformat(),
             duration=0,
-            user_responses=[],
-            ai_responses=[],
+            user_responses=(),
+            ai_responses=(),
             safety_status=SafetyStatus.UNKNOWN,
             emotion_score=0.0,
             keywords=[],
@@ -378,6 +476,7 @@ class SafetyChecker:
     async def _cleanup(self):
         """リソースのクリーンアップ"""
         self.conversation_active = False
+        self._new_response_event.set()
         if self.audio_handler:
             await self.audio_handler.stop_conversation()
 
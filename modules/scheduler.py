@@ -4,13 +4,10 @@
 """
 
 import asyncio
-import schedule
-import time
+import inspect
 from datetime import datetime, timedelta
-from typing import List, Callable, Optional, Dict
+from typing import Awaitable, List, Callable, Optional, Dict, Set, Tuple, Union
 from dataclasses import dataclass
-from threading import Thread
-import threading
 
 from .config import Config
 from .logger import get_logger
@@ -18,7 +15,10 @@ from .safety_checker import SafetyChecker, ConversationResult
 
 logger = get_logger(__name__)
 
-@dataclass
+# 安否確認コールバック（同期関数・async 関数のどちらも可）
+ScheduledCheckCallback = Callable[[str, str], Union[None, Awaitable[None]]]
+
+@dataclass(slots=True)
 class ScheduledCheck:
     """スケジュールされた安否確認"""
     time: str  # "10:00" format
@@ -30,12 +30,18 @@ class TimeAnnouncementScheduler:
     """時報・スケジューラー"""
 
     def __init__(self):
-        self.scheduled_checks: List[ScheduledCheck] = []
+        # (時刻, ユーザー名) をキーにして有効化・無効化・削除を直接引けるようにする
+        self.scheduled_checks: Dict[Tuple[str, str], ScheduledCheck] = {}
         self.running = False
-        self.scheduler_thread: Optional[Thread] = None
+        self.scheduler_task: Optional[asyncio.Task] = None
+
+        # スケジュール変更時に待機中のループを起こして次回時刻を再計算させる
+        self._schedule_changed = asyncio.Event()
+        self._last_fired: Optional[datetime] = None
+        self._check_tasks: Set[asyncio.Task] = set()
 
-        # コールバック
-        self.on_scheduled_check: Optional[Callable[[str, str], None]] = None
+        # コールバック（安否確認は async 関数も受け付ける）
+        self.on_scheduled_check: Optional[ScheduledCheckCallback] = None
         self.on_time_announcement: Optional[Callable[[str], None]] = None
 
         # デフォルトスケジュール設定
@@ -62,14 +68,8 @@ class TimeAnnouncementScheduler:
                 user_name=user_name
             )
 
-            self.scheduled_checks.append(scheduled_check)
-
-            # scheduleライブラリに登録
-            schedule.every().day.at(time_str).do(
-                self._execute_scheduled_check,
-                time_str,
-                user_name
-            )
+            self.scheduled_checks[(time_str, user_name)] = scheduled_check
+            self._schedule_changed.set()
 
             logger.info(f"安否確認スケジュール追加: {time_str} - {user_name}")
             return True
@@ -80,54 +80,50 @@ class TimeAnnouncementScheduler:
 
     def remove_scheduled_check(self, time_str: str, user_name: str) -> bool:
         """スケジュールから安否確認を削除"""
-        self.scheduled_checks = [
-            check for check in self.scheduled_checks
-            if not (check.time == time_str and check.user_name == user_name)
-        ]
+        if self.scheduled_checks.pop((time_str, user_name), None) is None:
+            logger.warning(f"削除対象のスケジュールがありません: {time_str} - {user_name}")
+            return False
 
-        # scheduleライブラリからも削除（再設定）
-        schedule.clear()
-        for check in self.scheduled_checks:
-            if check.enabled:
-                schedule.every().day.at(check.time).do(
-                    self._execute_scheduled_check,
-                    check.time,
-                    check.user_name
-                )
+        # 他の予定には触れず、スケジューラーに次回時刻の再計算だけを通知
+        self._schedule_changed.set()
 
         logger.info(f"安否確認スケジュール削除: {time_str} - {user_name}")
         return True
 
     def enable_schedule(self, time_str: str, user_name: str):
         """スケジュールを有効化"""
-        for check in self.scheduled_checks:
-            if check.time == time_str and check.user_name == user_name:
-                check.enabled = True
-                break
+        check = self.scheduled_checks.get((time_str, user_name))
+        if check and not check.enabled:
+            check.enabled = True
+            self._schedule_changed.set()
 
     def disable_schedule(self, time_str: str, user_name: str):
         """スケジュールを無効化"""
-        for check in self.scheduled_checks:
-            if check.time == time_str and check.user_name == user_name:
-                check.enabled = False
-                break
+        check = self.scheduled_checks.get((time_str, user_name))
+        if check and check.enabled:
+            check.enabled = False
+            self._schedule_changed.set()
 
-    def _execute_scheduled_check(self, time_str: str, user_name: str):
+    async def _execute_scheduled_check(self, time_str: str, user_name: str):
         """スケジュールされた安否確認を実行"""
         logger.info(f"定時安否確認開始: {time_str} - {user_name}")
 
         # 時報アナウンス
         self._announce_time(time_str)
 
-        # 安否確認実行のコールバック
+        # 安否確認実行のコールバック（awaitable ならイベントループ上で完了まで待つ）
         if self.on_scheduled_check:
-            self.on_scheduled_check(time_str, user_name)
+            try:
+                result = self.on_scheduled_check(time_str, user_name)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"定時安否確認コールバックエラー: {time_str} - {user_name} - {e}")
 
         # 実行時刻を記録
-        for check in self.scheduled_checks:
-            if check.time == time_str and check.user_name == user_name:
-                check.last_executed = datetime.now().isoformat()
-                break
+        check = self.scheduled_checks.get((time_str, user_name))
+        if check:
+            check.last_executed = datetime.now().isoformat()
 
     def _announce_time(self, time_str: str):
         """時報をアナウンス"""
@@ -144,37 +140,82 @@ class TimeAnnouncementScheduler:
             self.on_time_announcement(announcement)
 
     def start(self):
-        """スケジューラーを開始"""
+        """スケジューラーを開始（実行中のイベントループ上で呼び出す）"""
         if self.running:
             logger.warning("スケジューラーは既に実行中です")
             return
 
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.error("スケジューラーはイベントループ内で開始してください")
+            return
+
         self.running = True
-        self.scheduler_thread = Thread(target=self._run_scheduler, daemon=True)
-        self.scheduler_thread.start()
+        self.scheduler_task = loop.create_task(self._run_async())
 
         logger.info("スケジューラー開始")
 
     def stop(self):
         """スケジューラーを停止"""
         self.running = False
-        if self.scheduler_thread:
-            self.scheduler_thread.join(timeout=1)
+        if self.scheduler_task:
+            self.scheduler_task.cancel()
+            self.scheduler_task = None
 
         logger.info("スケジューラー停止")
 
-    def _run_scheduler(self):
-        """スケジューラーのメインループ"""
+    @staticmethod
+    def _next_fire_time(time_str: str, after: datetime) -> datetime:
+        """after より後で最初に time_str を迎える日時"""
+        check_time = datetime.strptime(time_str, "%H:%M").time()
+        fire_at = datetime.combine(after.date(), check_time)
+        if fire_at <= after:
+            fire_at += timedelta(days=1)
+        return fire_at
+
+    async def _run_async(self):
+        """スケジューラーのメインループ（次回の予定時刻まで眠る）"""
         while self.running:
-            schedule.run_pending()
-            time.sleep(1)
+            self._schedule_changed.clear()
+
+            now = datetime.now()
+            after = max(now, self._last_fired) if self._last_fired else now
+            fire_times = {
+                check.time: self._next_fire_time(check.time, after)
+                for check in self.scheduled_checks.values()
+                if check.enabled
+            }
+
+            if not fire_times:
+                # 有効な予定がなければ変更されるまで待機
+                await self._schedule_changed.wait()
+                continue
+
+            next_fire = min(fire_times.values())
+            delay = (next_fire - now).total_seconds()
+
+            try:
+                await asyncio.wait_for(self._schedule_changed.wait(), timeout=max(delay, 0))
+                continue  # スケジュールが変更されたので再計算
+            except asyncio.TimeoutError:
+                pass
+
+            self._last_fired = next_fire
+            for check in list(self.scheduled_checks.values()):
+                if check.enabled and fire_times.get(check.time) == next_fire:
+                    task = asyncio.create_task(
+                        self._execute_scheduled_check(check.time, check.user_name)
+                    )
+                    self._check_tasks.add(task)
+                    task.add_done_callback(self._check_tasks.discard)
 
     def get_next_scheduled_time(self) -> Optional[str]:
         """次回の安否確認時刻を取得"""
         now = datetime.now()
         today_checks = []
 
-        for check in self.scheduled_checks:
+        for check in self.scheduled_checks.values():
             if not check.enabled:
                 continue
 
@@ -191,7 +232,7 @@ class TimeAnnouncementScheduler:
         # 今日に予定がない場合は明日の最初
         tomorrow_checks = [
             datetime.strptime(check.time, "%H:%M").time()
-            for check in self.scheduled_checks
+            for check in self.scheduled_checks.values()
             if check.enabled
         ]
 
@@ -212,13 +253,13 @@ class TimeAnnouncementScheduler:
                     "enabled": check.enabled,
                     "last_executed": check.last_executed
                 }
-                for check in self.scheduled_checks
+                for check in self.scheduled_checks.values()
             ],
             "next_check": self.get_next_scheduled_time()
         }
 
     def set_callbacks(self,
-                     on_scheduled_check: Optional[Callable[[str, str], None]] = None,
+                     on_scheduled_check: Optional[ScheduledCheckCallback] = None,
                      on_time_announcement: Optional[Callable[[str], None]] = None):
         """コールバック関数を設定"""
         if on_scheduled_check:
@@ -233,6 +274,8 @@ class SafetyCheckManager:
     def __init__(self):
         self.scheduler = TimeAnnouncementScheduler()
         self.active_checks: Dict[str, SafetyChecker] = {}
+        # ユーザーごとの SafetyChecker を使い回す（毎回音声ハンドラーを作り直さない）
+        self._checker_pool: Dict[str, SafetyChecker] = {}
 
         # スケジューラーのコールバック設定
         self.scheduler.set_callbacks(
@@ -251,8 +294,11 @@ class SafetyCheckManager:
             return
 
         try:
-            # 安否確認実行
-            checker = SafetyChecker(user_name)
+            # 安否確認実行（同じユーザーの確認が並行している場合のみ新規作成）
+            checker = self._checker_pool.get(user_name)
+            if checker is None or checker in self.active_checks.values():
+                checker = SafetyChecker(user_name)
+                self._checker_pool.setdefault(user_name, checker)
             self.active_checks[check_id] = checker
 
             # 安否確認実行
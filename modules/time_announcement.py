@@ -7,6 +7,14 @@ import datetime
 import asyncio
 from typing import Optional
 
+# 時刻(0-23時)→挨拶の対応表
+_HOUR_TO_GREETING = (
+    ["こんばんは"] * 5            # 0-4時
+    + ["おはようございます"] * 7  # 5-11時
+    + ["こんにちは"] * 5          # 12-16時
+    + ["こんばんは"] * 7          # 17-23時
+)
+
 class TimeAnnouncement:
     def __init__(self):
         self.announcement_made = False
@@ -18,12 +26,7 @@ class TimeAnnouncement:
         minute = now.minute
 
         # 時間帯に応じた挨拶
-        if 5 <= hour < 12:
-            greeting = "おはようございます"
-        elif 12 <= hour < 17:
-            greeting = "こんにちは"
-        else:
-            greeting = "こんばんは"
+        greeting = _HOUR_TO_GREETING[hour]
 
         message = f"{greeting}。現在の時刻は{hour}時{minute}分です。今日もお話ししましょう。"
         return message
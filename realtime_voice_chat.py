@@ -9,7 +9,7 @@ import asyncio
 import signal
 
 from modules.config import Config
-from modules.logger import get_logger
+from modules.logger import flush_logs, get_logger
 from modules.audio_handler import RealtimeAudioHandler
 
 
@@ -57,6 +57,7 @@ async def run_realtime_conversation():
         await handler.stream_audio_conversation()
     finally:
         await handler.stop_conversation()
+        flush_logs()
 
 
 def main():
@@ -6,17 +6,16 @@ Whisper + GPT-4o + TTS
 
 import asyncio
 import io
-import tempfile
-import pyaudio
-import wave
-import openai
+import json
+import re
+import struct
+import numpy as np
 import os
 import sys
 import time
-import subprocess
-import struct
-import math
+import shutil
 from datetime import datetime
+from pathlib import Path
 
 # モジュールパスを追加
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -26,12 +25,85 @@ from modules.logger import get_logger
 
 logger = get_logger(__name__)
 
+# システムプロンプト（毎ターン同じオブジェクトを使い回す）
+SYSTEM_PROMPT = """あなたは高齢者向けの優しい会話相手です。
+
+【重要】
+- 親しみやすく、温かい話し方
+- 簡潔で分かりやすい言葉（1-2文程度）
+- 相手の気持ちに寄り添う
+- 体調や気分を自然に確認
+- 相手のペースに合わせる
+
+初回は軽い挨拶から始めて、徐々に安否確認につなげてください。"""
+_SYSTEM_MSG = {"role": "system", "content": SYSTEM_PROMPT}
+
+# 意味的応答キャッシュ（「元気です」「はい」のような短い発話のみ対象）
+RESPONSE_CACHE_MODEL = "text-embedding-3-small"
+RESPONSE_CACHE_DIM = 1536
+RESPONSE_CACHE_THRESHOLD = 0.92
+RESPONSE_CACHE_MAX_CHARS = 20
+RESPONSE_CACHE_MAX_ENTRIES = 500  # 上限に達したら古いものから上書き（約3MB）
+
+# 終了コマンド（1回の走査で判定できるよう正規表現にまとめる）
+END_PHRASES = (
+    "終了", "おわり", "バイバイ", "さようなら",
+    "もういい", "やめる", "ストップ", "終わり",
+    "また今度", "またね"
+)
+_END_RE = re.compile("|".join(map(re.escape, END_PHRASES)))
+
+def _vad_append_loop(src, dst, offset, limit):
+    """チャンクを dst[offset:] へ書き込みつつRMSを求める（numbaでコンパイルして使う）
+
+    RMSが limit を超えると確定した時点で積和を打ち切り、残りはそのままコピーする
+    （このとき返すRMSは limit より大きい途中の値）。
+    """
+    n = src.shape[0]
+    total = 0.0
+    total_limit = limit * limit * n
+    i = 0
+    while i < n:
+        value = src[i]
+        dst[offset + i] = value
+        total += float(value) * float(value)
+        i += 1
+        if total > total_limit:
+            break
+    dst[offset + i:offset + n] = src[i:]
+    return (total / n) ** 0.5, offset + n
+
+def _vad_append_numpy(src, dst, offset, limit):
+    """チャンクを dst[offset:] へ書き込みつつRMSを求める（numba未インストール時はNumPyで計算）"""
+    end = offset + src.size
+    dst[offset:end] = src
+    return float(np.sqrt(src.dot(src.astype(np.int64)) / src.size)), end
+
+_vad_kernel = None
+
+def _load_vad_kernel():
+    """音声検知カーネルを返す（numbaは読み込みが重いため初回呼び出し時に読み込む）"""
+    global _vad_kernel
+    if _vad_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:
+            _vad_kernel = _vad_append_numpy
+        else:
+            _vad_kernel = njit(cache=True, fastmath=True)(_vad_append_loop)
+    return _vad_kernel
+
 class SimpleVoiceChat:
     """シンプル音声会話システム"""
 
     def __init__(self):
+        # PyAudio・OpenAIは読み込みが重いため、インスタンス生成時まで遅らせる
+        import openai
+        import pyaudio
+
         # OpenAI設定
-        self.client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+        # 非同期クライアントを使い、通信待ちの間も録音・再生を止めない
+        self.client = openai.AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
 
         # 音声設定
         self.chunk = 512
@@ -39,77 +111,163 @@ class SimpleVoiceChat:
         self.channels = 1
         self.rate = 16000
         self.record_seconds = 0.5  # 0.5秒単位で録音
+        self.speech_threshold = 500  # 音声とみなすRMSの閾値の下限（調整可能）
+        self._noise_ema = 200.0  # 周囲の雑音レベル（無音チャンクのRMSの指数移動平均）
 
         self.audio = pyaudio.PyAudio()
+        self._stream = None
+        self._audio_queue = None
+
+        # 発話バッファ（30秒分を確保し、チャンクごとのbytes連結を避ける）
+        self._utt_buf = np.empty(self.rate * 30, dtype=np.int16)
+        self._utt_len = 0
+
+        # 標準入力からストリーミング再生できるプレイヤーを起動時に一度だけ探す
+        self._stream_player_argv = ["mpg123", "-q", "-"] if shutil.which("mpg123") else None
+        # ストリーミングできない場合に一時ファイルを渡して再生するプレイヤー
+        self._player_argv = ["afplay"] if shutil.which("afplay") else ["mpg123", "-q"]
+
+        # Whisperへの送信はOpus（約1/20のサイズ）を優先する
+        # soundfile も読み込みが重いため、ここで初めて読み込む
+        try:
+            import soundfile
+        except ImportError:
+            soundfile = None
+        self._soundfile = soundfile
+        self._opus_available = soundfile is not None and 'OPUS' in soundfile.available_subtypes('OGG')
+
+        # 形式は固定なので、WAVヘッダー（44バイト）を一度だけ組み立てておく
+        self._sample_width = self.audio.get_sample_size(self.format)
+        self._wav_header_template = struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 0, b'WAVE', b'fmt ', 16, 1,
+            self.channels, self.rate,
+            self.rate * self.channels * self._sample_width,
+            self.channels * self._sample_width,
+            self._sample_width * 8,
+            b'data', 0
+        )
+
         self.running = False
+        self._speaking = False
         self.conversation_history = []
 
-        print("🎤 シンプル音声会話システム初期化完了")
-
-    def detect_speech(self, audio_data) -> bool:
-        """音声検知（音量ベース）"""
-        # バイトデータを16bit整数に変換
-        fmt = '<' + ('h' * (len(audio_data) // 2))
-        audio_ints = struct.unpack(fmt, audio_data)
+        # 応答キャッシュ（正規化済み埋め込み行列と、対応する（直前のAI応答, 応答文）の組）
+        # 行列は上限件数分を確保したリングバッファで、_cache_next が次に書き込む行
+        self._cache_path = Path(Config.RESPONSE_CACHE_PATH)
+        self._cache_embs = np.zeros((RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_DIM), dtype=np.float32)
+        self._cache_vals = []
+        self._cache_next = 0
+        self._load_response_cache()
+
+        # 体調不良・緊急を示す発話には使い回しの応答を返さない（安全チェックと同じ語を使う）
+        # safety_checker は音声処理モジュールを読み込むため、ここで初めて読み込む
+        from modules.safety_checker import NEGATIVE_WORDS, EMERGENCY_KEYWORDS
+        self._no_cache_re = re.compile("|".join(map(re.escape, NEGATIVE_WORDS + EMERGENCY_KEYWORDS)))
+
+        # 初回チャンクでJITコンパイル待ちが発生しないよう事前に実行しておく
+        # 実際の入力と同じ読み取り専用配列（np.frombuffer）で型を合わせて呼ぶ
+        warmup_chunk = np.frombuffer(bytes(self.chunk * 2), dtype=np.int16)
+        self._vad_append = _load_vad_kernel()
+        self._vad_append(warmup_chunk, self._utt_buf, 0, float(self.speech_threshold))
 
-        # RMS計算
-        sum_squares = sum(x * x for x in audio_ints)
-        rms = math.sqrt(sum_squares / len(audio_ints))
+        print("🎤 シンプル音声会話システム初期化完了")
 
-        # 閾値（調整可能）
-        threshold = 500
-        return rms > threshold
+    def _speech_threshold(self) -> float:
+        """現在の判定閾値（雑音レベルの3倍、ただし下限あり）"""
+        return max(float(self.speech_threshold), 3.0 * self._noise_ema)
 
     async def listen_for_speech(self) -> bytes:
         """音声を聞いて録音"""
         print("👂 音声を待機中... (話しかけてください)")
 
-        stream = self.audio.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk
-        )
+        # 入力ストリームは初回に開いたら会話中は開いたままにする
+        if self._stream is None:
+            self._open_input_stream()
 
-        frames = []
+        self._utt_len = 0
         is_recording = False
         silence_count = 0
         max_silence = 15  # 約0.75秒の無音で終了
 
-        try:
-            while True:
-                data = stream.read(self.chunk, exception_on_overflow=False)
+        while True:
+            data = await self._audio_queue.get()
 
-                speech_detected = self.detect_speech(data)
+            if self._speaking:
+                # 再生中のAI音声を拾わないよう、その間の入力は捨てる
+                is_recording = False
+                self._utt_len = 0
+                silence_count = 0
+                continue
 
-                if speech_detected:
-                    if not is_recording:
-                        print("🎤 音声検知開始")
-                        is_recording = True
-                        frames = []
+            # 判定と同時に発話バッファへ書き込む（非録音中は _utt_len が0なので先頭に書かれる）
+            samples = np.frombuffer(data, dtype=np.int16)
+            self._reserve_utterance(samples.size)
+            # 閾値超えが確定すれば積和は打ち切られる（無音チャンクのRMSは正確）
+            threshold = self._speech_threshold()
+            rms, end = self._vad_append(samples, self._utt_buf, self._utt_len, threshold)
 
-                    frames.append(data)
-                    silence_count = 0
+            if rms > threshold:
+                if not is_recording:
+                    print("🎤 音声検知開始")
+                    is_recording = True
 
-                elif is_recording:
-                    frames.append(data)  # 無音部分も少し録音
+                self._utt_len = end
+                silence_count = 0
+
+            else:
+                # 無音チャンクで雑音レベルを追跡し、物音での誤検知を減らす
+                self._noise_ema = 0.95 * self._noise_ema + 0.05 * rms
+
+                if is_recording:
+                    self._utt_len = end  # 無音部分も少し録音
                     silence_count += 1
 
                     if silence_count > max_silence:
                         print("🔇 音声検知終了")
                         break
 
-                # 非ブロッキング処理
-                await asyncio.sleep(0.01)
+        if self._utt_len:
+            return self._utt_buf[:self._utt_len].tobytes()
+        return b''
 
-        finally:
-            stream.stop_stream()
-            stream.close()
+    def _open_input_stream(self):
+        """マイク入力ストリームを開く（PortAudioのスレッドからキューへチャンクを渡す）"""
+        import pyaudio
 
-        if frames:
-            return b''.join(frames)
-        return b''
+        loop = asyncio.get_running_loop()
+        self._audio_queue = asyncio.Queue()
+
+        def on_audio(in_data, frame_count, time_info, status):
+            loop.call_soon_threadsafe(self._audio_queue.put_nowait, in_data)
+            return (None, pyaudio.paContinue)
+
+        self._stream = self.audio.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.chunk,
+            stream_callback=on_audio
+        )
+
+    def _close_input_stream(self):
+        """マイク入力ストリームを閉じる"""
+        if self._stream is None:
+            return
+
+        self._stream.stop_stream()
+        self._stream.close()
+        self._stream = None
+
+    def _reserve_utterance(self, size: int):
+        """発話バッファに size サンプル分の空きを確保する（足りなければ倍に拡張）"""
+        end = self._utt_len + size
+
+        if end > self._utt_buf.size:
+            grown = np.empty(max(end, self._utt_buf.size * 2), dtype=np.int16)
+            grown[:self._utt_len] = self._utt_buf[:self._utt_len]
+            self._utt_buf = grown
 
     async def transcribe_audio(self, audio_data: bytes) -> str:
         """音声をテキストに変換"""
@@ -119,20 +277,9 @@ class SimpleVoiceChat:
         try:
             print("🔄 音声認識中...")
 
-            import io
-
-            buffer = io.BytesIO()
-            with wave.open(buffer, 'wb') as wav_file:
-                wav_file.setnchannels(self.channels)
-                wav_file.setsampwidth(self.audio.get_sample_size(self.format))
-                wav_file.setframerate(self.rate)
-                wav_file.writeframes(audio_data)
-
-            buffer.seek(0)
-
-            transcript = self.client.audio.transcriptions.create(
+            transcript = await self.client.audio.transcriptions.create(
                 model="whisper-1",
-                file=("audio.wav", buffer, "audio/wav"),
+                file=self._encode_upload(audio_data),
                 language="ja"
             )
 
@@ -142,6 +289,31 @@ class SimpleVoiceChat:
             logger.error(f"音声認識エラー: {e}")
             return ""
 
+    def _encode_upload(self, audio_data: bytes):
+        """Whisperへ送るファイルを作る（Opus圧縮できなければWAV）"""
+        if self._opus_available:
+            try:
+                buffer = io.BytesIO()
+                self._soundfile.write(
+                    buffer,
+                    np.frombuffer(audio_data, dtype=np.int16),
+                    self.rate,
+                    format='OGG',
+                    subtype='OPUS'
+                )
+                return ("audio.ogg", buffer.getvalue(), "audio/ogg")
+            except Exception as e:
+                logger.warning(f"Opusエンコードエラー、WAVで送信します: {e}")
+
+        # サイズ欄だけ差し替えてヘッダーとPCMを連結
+        header = (
+            self._wav_header_template[:4]
+            + struct.pack('<I', 36 + len(audio_data))
+            + self._wav_header_template[8:40]
+            + struct.pack('<I', len(audio_data))
+        )
+        return ("audio.wav", header + audio_data, "audio/wav")
+
     async def generate_response(self, user_text: str) -> str:
         """AI応答生成"""
         try:
@@ -150,79 +322,185 @@ class SimpleVoiceChat:
             # 会話履歴に追加
             self.conversation_history.append({"role": "user", "content": user_text})
 
-            # 履歴管理（最新20件保持）
-            if len(self.conversation_history) > 20:
-                self.conversation_history = self.conversation_history[-20:]
+            # 履歴管理（先頭を固定したまま伸ばし、40件を超えたら最新20件から再開）
+            # 毎回ずらさないことで、先頭が同じリクエストのプロンプトキャッシュが効く
+            if len(self.conversation_history) > 40:
+                del self.conversation_history[:-20]
 
-            # システムプロンプト
-            system_prompt = """あなたは高齢者向けの優しい会話相手です。
+            # 直前のAI応答（同じ問いかけへの返事でなければキャッシュは使わない）
+            previous = self.conversation_history[-2] if len(self.conversation_history) > 1 else None
+            context = previous["content"] if previous and previous["role"] == "assistant" else ""
 
-【重要】
-- 親しみやすく、温かい話し方
-- 簡潔で分かりやすい言葉（1-2文程度）
-- 相手の気持ちに寄り添う
-- 体調や気分を自然に確認
-- 相手のペースに合わせる
+            messages = [_SYSTEM_MSG, *self.conversation_history]
 
-初回は軽い挨拶から始めて、徐々に安否確認につなげてください。"""
-
-            messages = [{"role": "system", "content": system_prompt}] + self.conversation_history
-
-            # GPT-4o応答生成
-            response = self.client.chat.completions.create(
+            # GPT-4o応答生成（埋め込み取得と同時に始め、キャッシュを使う場合は取り消す）
+            chat_task = asyncio.create_task(self.client.chat.completions.create(
                 model="gpt-4o",
                 messages=messages,
                 max_tokens=100,
                 temperature=0.8
-            )
+            ))
+            try:
+                # 同じ問いかけへの似た短い発話の応答が既にあれば、それを再利用する
+                embedding = await self._embed_for_cache(user_text)
+                best_similarity = -1.0
+                if embedding is not None and self._cache_vals:
+                    similarities = self._cache_embs[:len(self._cache_vals)] @ embedding
+                    same_context = np.fromiter(
+                        (ctx == context for ctx, _ in self._cache_vals),
+                        dtype=bool, count=len(self._cache_vals)
+                    )
+                    similarities = np.where(same_context, similarities, -1.0)
+                    best = int(similarities.argmax())
+                    best_similarity = float(similarities[best])
+                    if best_similarity > RESPONSE_CACHE_THRESHOLD:
+                        ai_text = self._cache_vals[best][1]
+                        self.conversation_history.append({"role": "assistant", "content": ai_text})
+                        return ai_text
+
+                response = await chat_task
+            finally:
+                if not chat_task.done():
+                    chat_task.cancel()
+                elif not chat_task.cancelled():
+                    chat_task.exception()  # 使わなかった応答の例外を未回収のまま残さない
 
             ai_text = response.choices[0].message.content.strip()
 
             # 履歴に追加
             self.conversation_history.append({"role": "assistant", "content": ai_text})
 
+            # 既存の項目と十分似ている発話は重複して登録しない
+            if embedding is not None and best_similarity <= RESPONSE_CACHE_THRESHOLD:
+                self._store_cached_response(embedding, context, ai_text)
+
             return ai_text
 
         except Exception as e:
             logger.error(f"AI応答エラー: {e}")
             return "すみません、よく聞こえませんでした。もう一度お話しください。"
 
+    async def _embed_for_cache(self, user_text: str):
+        """キャッシュ照合用の正規化済み埋め込み（長い発話・体調不良や緊急の発話・失敗時は None）"""
+        if len(user_text) > RESPONSE_CACHE_MAX_CHARS or self._no_cache_re.search(user_text):
+            return None
+
+        try:
+            response = await self.client.embeddings.create(
+                model=RESPONSE_CACHE_MODEL,
+                input=user_text
+            )
+        except Exception as e:
+            logger.warning(f"埋め込み取得エラー: {e}")
+            return None
+
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+
+    def _store_cached_response(self, embedding, context: str, ai_text: str):
+        """応答を直前のAI応答と組にしてキャッシュへ追加（上限に達したら最も古い項目を上書き）"""
+        row = self._cache_next
+        self._cache_embs[row] = embedding
+
+        if row < len(self._cache_vals):
+            self._cache_vals[row] = (context, ai_text)
+        else:
+            self._cache_vals.append((context, ai_text))
+
+        self._cache_next = (row + 1) % RESPONSE_CACHE_MAX_ENTRIES
+
+    def _load_response_cache(self):
+        """保存済みの応答キャッシュを読み込む（上限を超える分は古いものを捨てる）"""
+        embs_path = self._cache_path.with_suffix(".npy")
+        vals_path = self._cache_path.with_suffix(".json")
+
+        try:
+            if not (embs_path.exists() and vals_path.exists()):
+                return
+
+            embs = np.load(embs_path)
+            vals = json.loads(vals_path.read_text(encoding="utf-8"))
+            if embs.shape != (len(vals), RESPONSE_CACHE_DIM):
+                return
+            # 直前のAI応答を持たない旧形式（応答文のみ）のキャッシュは使わない
+            if not all(isinstance(val, list) and len(val) == 2 for val in vals):
+                return
+
+            embs = embs[-RESPONSE_CACHE_MAX_ENTRIES:]
+            vals = vals[-RESPONSE_CACHE_MAX_ENTRIES:]
+            self._cache_embs[:len(vals)] = embs
+            self._cache_vals = [tuple(val) for val in vals]
+            self._cache_next = len(vals) % RESPONSE_CACHE_MAX_ENTRIES
+        except Exception as e:
+            logger.warning(f"応答キャッシュ読み込みエラー: {e}")
+
+    def _save_response_cache(self):
+        """応答キャッシュを古い順に保存する"""
+        if not self._cache_vals:
+            return
+
+        # 満杯のときは _cache_next の行が最も古いので、そこから並べ直す
+        size = len(self._cache_vals)
+        start = self._cache_next if size == RESPONSE_CACHE_MAX_ENTRIES else 0
+        embs = np.concatenate([self._cache_embs[start:size], self._cache_embs[:start]])
+        vals = self._cache_vals[start:] + self._cache_vals[:start]
+
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(self._cache_path.with_suffix(".npy"), embs)
+            self._cache_path.with_suffix(".json").write_text(
+                json.dumps(vals, ensure_ascii=False), encoding="utf-8"
+            )
+        except Exception as e:
+            logger.warning(f"応答キャッシュ保存エラー: {e}")
+
     async def speak_text(self, text: str):
         """テキストを音声で再生"""
+        self._speaking = True
         try:
             print("🔊 音声生成中...")
 
-            # TTS生成
-            response = self.client.audio.speech.create(
+            # TTS生成（受信したチャンクから順に再生側へ渡す）
+            async with self.client.audio.speech.with_streaming_response.create(
                 model="tts-1",
                 voice="alloy",
                 input=text,
                 response_format="mp3"
-            )
-
-            # 一時ファイル保存
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio:
-                temp_audio.write(response.content)
-                temp_audio_path = temp_audio.name
+            ) as response:
+                if self._stream_player_argv:
+                    # mpg123は標準入力から受信と並行してデコード・再生できる
+                    process = await asyncio.create_subprocess_exec(
+                        *self._stream_player_argv,
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.DEVNULL
+                    )
+                    print("🔊 音声再生中...")
+                    async for chunk in response.iter_bytes(4096):
+                        process.stdin.write(chunk)
+                        await process.stdin.drain()
+                    process.stdin.close()
+                    await process.wait()
+                    print("✅ 音声再生完了")
+                    return
+
+                # afplayは標準入力を読めないため一時ファイルへ逐次書き込む
+                import tempfile
+
+                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_audio:
+                    async for chunk in response.iter_bytes(4096):
+                        temp_audio.write(chunk)
+                    temp_audio_path = temp_audio.name
 
             print("🔊 音声再生中...")
 
-            # macOSのafplayで再生
-            if os.system("which afplay > /dev/null 2>&1") == 0:
-                process = await asyncio.create_subprocess_exec(
-                    'afplay', temp_audio_path,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await process.wait()
-            else:
-                # Linuxの場合はmpg123を試行
-                process = await asyncio.create_subprocess_exec(
-                    'mpg123', temp_audio_path,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                await process.wait()
+            # 起動時に選んだプレイヤー（macOSはafplay）で再生
+            process = await asyncio.create_subprocess_exec(
+                *self._player_argv, temp_audio_path,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            await process.wait()
 
             # 一時ファイル削除
             os.unlink(temp_audio_path)
@@ -231,15 +509,12 @@ class SimpleVoiceChat:
         except Exception as e:
             logger.error(f"音声再生エラー: {e}")
             print(f"❌ 音声再生エラー: {e}")
+        finally:
+            self._speaking = False
 
     def is_end_command(self, text: str) -> bool:
         """終了コマンド判定"""
-        end_phrases = [
-            "終了", "おわり", "バイバイ", "さようなら",
-            "もういい", "やめる", "ストップ", "終わり",
-            "また今度", "またね"
-        ]
-        return any(phrase in text for phrase in end_phrases)
+        return _END_RE.search(text) is not None
 
     async def run_conversation(self):
         """会話メインループ"""
@@ -248,6 +523,9 @@ class SimpleVoiceChat:
         print("🌸 音声会話システム開始")
         print("💡 自動で開始します...")
 
+        # 挨拶の生成・再生と並行してAPIへの接続をもう1本確立しておく
+        warm_up = asyncio.create_task(self._warm_up_client())
+
         # 開始挨拶
         current_hour = datetime.now().hour
         if 6 <= current_hour < 12:
@@ -260,53 +538,100 @@ class SimpleVoiceChat:
         print(f"🤖 AI: {greeting}")
         await self.speak_text(greeting)
 
-        conversation_count = 0
+        # 録音→音声認識→応答生成→再生をキューでつなぎ、各段を並行して動かす
+        utterances: asyncio.Queue = asyncio.Queue()
+        user_texts: asyncio.Queue = asyncio.Queue()
+        replies: asyncio.Queue = asyncio.Queue()
+
+        speak_task = asyncio.create_task(self._speak_stage(replies))
+        stages = [
+            asyncio.create_task(self._capture_stage(utterances)),
+            asyncio.create_task(self._transcribe_stage(utterances, user_texts)),
+            asyncio.create_task(self._response_stage(user_texts, replies)),
+            speak_task,
+        ]
 
         try:
-            while self.running:
-                # 音声を聞く
-                audio_data = await self.listen_for_speech()
+            # 終了の挨拶を再生し終えるか、いずれかの段が異常終了するまで待つ
+            pending = set(stages)
+            while speak_task in pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                errors = [task.exception() for task in done if task.exception() is not None]
+                if errors:
+                    logger.error(f"会話処理エラー: {errors[0]}")
+                    break
 
-                if audio_data:
-                    # 音声認識
-                    user_text = await self.transcribe_audio(audio_data)
-
-                    if user_text:
-                        print(f"👤 ユーザー: {user_text}")
-                        conversation_count += 1
+        except KeyboardInterrupt:
+            print("\n🛑 Ctrl+Cで終了")
+        finally:
+            self.running = False
+            for task in (warm_up, *stages):
+                task.cancel()
+            await asyncio.gather(warm_up, *stages, return_exceptions=True)
+            self._save_response_cache()
+            self._close_input_stream()
+            self.audio.terminate()
 
-                        # 終了コマンドチェック
-                        if self.is_end_command(user_text):
-                            goodbye = "お話しできて良かったです。また今度お話ししましょう。お体に気をつけてくださいね。"
-                            print(f"🤖 AI: {goodbye}")
-                            await self.speak_text(goodbye)
-                            break
+    async def _warm_up_client(self):
+        """軽いAPI呼び出しでTLS接続を事前に確立する（失敗しても会話は続ける）"""
+        try:
+            await self.client.with_options(timeout=5).models.list()
+        except Exception as e:
+            logger.debug(f"API接続の事前確立に失敗: {e}")
 
-                        # AI応答生成
-                        ai_response = await self.generate_response(user_text)
-                        print(f"🤖 AI: {ai_response}")
+    async def _capture_stage(self, utterances: asyncio.Queue):
+        """発話を録音し続けて認識待ちキューへ積む"""
+        while self.running:
+            audio_data = await self.listen_for_speech()
 
-                        # 音声で応答
-                        await self.speak_text(ai_response)
+            if audio_data:
+                await utterances.put(audio_data)
+            else:
+                print("⚠️ 音声データが取得できませんでした")
 
-                        # 長時間会話の場合は自然に終了提案
-                        if conversation_count >= 8:
-                            ending_suggestion = "たくさんお話しできて楽しかったです。今日はこのあたりでいかがでしょうか？"
-                            print(f"🤖 AI: {ending_suggestion}")
-                            await self.speak_text(ending_suggestion)
-                            conversation_count = 0  # リセット
+    async def _transcribe_stage(self, utterances: asyncio.Queue, user_texts: asyncio.Queue):
+        """録音済みの発話を順に音声認識する"""
+        while self.running:
+            audio_data = await utterances.get()
+            user_text = await self.transcribe_audio(audio_data)
 
-                    else:
-                        print("⚠️ 音声が認識できませんでした")
+            if user_text:
+                await user_texts.put(user_text)
+            else:
+                print("⚠️ 音声が認識できませんでした")
 
-                else:
-                    print("⚠️ 音声データが取得できませんでした")
+    async def _response_stage(self, user_texts: asyncio.Queue, replies: asyncio.Queue):
+        """認識結果からAI応答を生成する（終了コマンドで None を流して終える）"""
+        conversation_count = 0
 
-        except KeyboardInterrupt:
-            print("\n🛑 Ctrl+Cで終了")
-        finally:
-            self.running = False
-            self.audio.terminate()
+        while self.running:
+            user_text = await user_texts.get()
+            print(f"👤 ユーザー: {user_text}")
+            conversation_count += 1
+
+            # 終了コマンドチェック
+            if self.is_end_command(user_text):
+                await replies.put("お話しできて良かったです。また今度お話ししましょう。お体に気をつけてくださいね。")
+                await replies.put(None)
+                return
+
+            # AI応答生成
+            await replies.put(await self.generate_response(user_text))
+
+            # 長時間会話の場合は自然に終了提案
+            if conversation_count >= 8:
+                await replies.put("たくさんお話しできて楽しかったです。今日はこのあたりでいかがでしょうか？")
+                conversation_count = 0  # リセット
+
+    async def _speak_stage(self, replies: asyncio.Queue):
+        """応答を順に音声で再生する"""
+        while True:
+            ai_text = await replies.get()
+            if ai_text is None:
+                return
+
+            print(f"🤖 AI: {ai_text}")
+            await self.speak_text(ai_text)
 
 async def main():
     """メイン実行"""
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+感情分析のキーワード検出テスト
+同じ位置から始まるキーワード（「心配」と「心配性」など）の取りこぼしを確認
+"""
+
+import os
+import sys
+
+# モジュールパスを追加
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from modules.emotion_analyzer import EmotionAnalyzer
+
+# 接頭辞が重なるキーワードを含む発話
+PREFIX_COLLISION_TEXTS = [
+    "心配性なんです",
+    "不安定です",
+    "やる気ないです",
+    "調子良いし元気です",
+]
+
+
+def naive_analysis(analyzer: EmotionAnalyzer, text: str):
+    """キーワードごとに部分一致を調べる素朴な実装（期待値）"""
+    scores = {}
+    detected = []
+    for category, keywords in analyzer.emotion_keywords.items():
+        score = 0
+        for keyword in keywords:
+            if keyword in text:
+                score += 1
+                detected.append(keyword)
+        scores[category.value] = score / max(len(text.split()) * 0.1, 1)
+    return scores, detected
+
+
+def test_prefix_collision_keywords():
+    """同じ位置から始まる短いキーワードも検出される"""
+    analyzer = EmotionAnalyzer()
+
+    for text in PREFIX_COLLISION_TEXTS:
+        analysis = analyzer.analyze_emotion([text])
+        expected_scores, expected_keywords = naive_analysis(analyzer, text)
+
+        assert analysis.sentiment_details == expected_scores, text
+        assert analysis.detected_keywords == expected_keywords, text
+
+
+def test_prefix_collision_scores():
+    """代表例のスコア"""
+    analyzer = EmotionAnalyzer()
+
+    assert analyzer.analyze_emotion(["心配性なんです"]).sentiment_details["anxious"] == 2.0
+    assert analyzer.analyze_emotion(["やる気ないです"]).sentiment_details["energetic"] == 1.0
+
+
+if __name__ == "__main__":
+    test_prefix_collision_keywords()
+    test_prefix_collision_scores()
+    print("✅ 感情分析キーワード検出テスト完了")
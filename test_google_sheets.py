@@ -80,8 +80,8 @@ def test_record_writing():
         test_result = ConversationResult(
             timestamp=datetime.now().isoformat(),
             duration=120.5,
-            user_responses=["今日は元気です", "薬も飲んでいます", "散歩もしました"],
-            ai_responses=["それは良かったです", "お薬もちゃんと飲んで偉いですね", "散歩は大切ですね"],
+            user_responses=("今日は元気です", "薬も飲んでいます", "散歩もしました"),
+            ai_responses=("それは良かったです", "お薬もちゃんと飲んで偉いですね", "散歩は大切ですね"),
             safety_status=SafetyStatus.SAFE,
             emotion_score=0.8,
             keywords=["元気", "薬", "散歩"],
@@ -92,6 +92,11 @@ def test_record_writing():
         # 記録保存
         success = manager.record_conversation(test_result, "テストユーザー")
 
+        if success:
+            # 書き込みはバックグラウンドで行われるため完了を待つ
+            manager.flush()
+            success = manager.failed_records == 0
+
         if success:
             print("✅ テスト記録の保存に成功しました")
             print("📊 Googleシートを確認してください")
@@ -4,6 +4,7 @@
 """
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 def measure_time(description, func):
     """処理時間を計測"""
@@ -13,6 +14,12 @@ def measure_time(description, func):
     print(f"{description:40s}: {elapsed:6.3f}秒")
     return result, elapsed
 
+def timed_init(factory):
+    """インスタンス生成時間を計測（スレッド内で使用）"""
+    start = time.time()
+    instance = factory()
+    return instance, time.time() - start
+
 print("=" * 70)
 print("起動時間の詳細分析")
 print("=" * 70)
@@ -42,6 +49,7 @@ measure_time("2. サードパーティライブラリ", import_heavy_libs)
 
 # 3. configモジュール（.env読み込み含む）
 def import_config():
+    global Config
     from modules.config import Config
     return True
 
@@ -49,6 +57,7 @@ measure_time("3. Config (.env読み込み)", import_config)
 
 # 4. audio_handlerモジュール
 def import_audio_handler():
+    global RealtimeAudioHandler
     from modules.audio_handler import RealtimeAudioHandler
     return True
 
@@ -56,6 +65,7 @@ measure_time("4. audio_handler (PyAudio含む)", import_audio_handler)
 
 # 5. その他のモジュール
 def import_other_modules():
+    global EmailNotifier
     from modules.logger import get_logger
     from modules.safety_checker import ConversationResult, SafetyStatus
     from modules.email_notifier import EmailNotifier
@@ -65,6 +75,7 @@ measure_time("5. その他のモジュール", import_other_modules)
 
 # 6. emotion_analyzerモジュール（DB初期化含む）
 def import_emotion_analyzer():
+    global EmotionRecordManager
     from modules.emotion_analyzer import EmotionRecordManager
     return EmotionRecordManager()
 
@@ -72,28 +83,32 @@ emotion_manager, db_time = measure_time("6. emotion_analyzer (DB初期化)", imp
 
 # 7. google_sheetsモジュール（認証含む）
 def import_google_sheets():
+    global GoogleSheetsManager
     from modules.google_sheets import GoogleSheetsManager
     return GoogleSheetsManager()
 
 sheets_manager, sheets_time = measure_time("7. google_sheets (認証・初期化)", import_google_sheets)
 
 # 8. RealtimeCareAppクラスのインスタンス化
+# （クラスは手順3〜7で取り込んだものを使い、初期化時間だけを計測する）
 def instantiate_app():
-    from modules.config import Config
-    from modules.audio_handler import RealtimeAudioHandler
-    from modules.emotion_analyzer import EmotionRecordManager
-    from modules.google_sheets import GoogleSheetsManager
-    from modules.email_notifier import EmailNotifier
-
     # Config検証
     if not Config.validate_config():
         raise RuntimeError("環境変数の設定が不足しています")
 
-    # 各マネージャーのインスタンス化
-    handler = RealtimeAudioHandler()
-    emotion_manager = EmotionRecordManager()
-    google_sheets = GoogleSheetsManager()
-    email_notifier = EmailNotifier()
+    # 各マネージャーのインスタンス化（main.pyと同じく音声ハンドラー以外は並行）
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {
+            "EmotionRecordManager": executor.submit(timed_init, EmotionRecordManager),
+            "GoogleSheetsManager": executor.submit(timed_init, GoogleSheetsManager),
+            "EmailNotifier": executor.submit(timed_init, EmailNotifier),
+        }
+        handler, handler_time = timed_init(RealtimeAudioHandler)
+        results = {name: future.result() for name, future in futures.items()}
+
+    print(f"    {'RealtimeAudioHandler':36s}: {handler_time:6.3f}秒")
+    for name, (_, elapsed) in results.items():
+        print(f"    {name:36s}: {elapsed:6.3f}秒")
 
     return True
 